@@ -8,9 +8,18 @@ Catches VS-specific errors that Roslyn cannot detect because they involve runtim
   VS-PORT-003: ScalarSum/GenericSum using .a/.b instead of .multiInputs[n]
 
 Usage:
-    python3 check_port_keys.py <path_to_cs_file>
+    python3 check_port_keys.py <path_to_cs_file> [<path_to_cs_file> ...]
+
+Multiple files are checked in one process, each under its own "=== <file> ===" header.
+
+Limitation: source is scanned as bytes, so identifiers are matched as ASCII only.
+A non-ASCII identifier is split at its first non-ASCII character, e.g. `éx.a` is
+read as `x.a` and reported if `x` is a ScalarSum. Generated scripts use ASCII names.
 """
 
+import bisect
+import mmap
+import os
 import re
 import sys
 from pathlib import Path
@@ -41,39 +50,147 @@ KNOWN_VOID_METHODS = {
 # Multi-input unit types that use multiInputs[n], NOT a/b
 MULTI_INPUT_UNITS = {"ScalarSum", "GenericSum", "ScalarSubtract", "GenericSubtract"}
 
+# Frozen lookup tables built once at import for the per-match membership checks
+_VOID_BY_TYPE = {
+    type_name: frozenset(methods) for type_name, methods in KNOWN_VOID_METHODS.items()
+}
+_NO_VOID_METHODS = frozenset()
+_MULTI_INPUT_UNITS = frozenset(MULTI_INPUT_UNITS)
+_MULTI_INPUT_TOKENS = tuple(unit.encode("ascii") for unit in sorted(_MULTI_INPUT_UNITS))
+_MULTI_INPUT_CTORS = frozenset(_MULTI_INPUT_TOKENS)
+
+# Source is lexed into two token kinds in one walk: "decl" for every `T v = new Ctor(`
+# head and "access" for port accessors. Constructor names are dispatched in Python by
+# set membership instead of a regex alternation. Both branches share the leading \b and
+# no quantified group nests another, so lexing stays linear even on long identifier or
+# whitespace runs in malformed input. Patterns work on raw bytes; only captured names
+# that end up in lookups or messages are decoded.
+_TOKEN_RE = re.compile(
+    rb'\b(?:'
+    rb'(?P<decl>(?P<decl_type>\w+)\s+(?P<decl_var>\w+)\s*=\s*'
+    rb'new\s+(?P<ctor>\w+)\s*\()'
+    rb'|(?P<access>(?P<acc_var>\w+)\.(?P<acc_name>equal|notEqual|result|a|b)\b)'
+    rb')',
+    re.MULTILINE
+)
+_COMPARISON_DECL_TYPES = frozenset({b"var", b"Equal", b"NotEqual"})
+_INVOKE_DECL_TYPES = frozenset({b"var", b"InvokeMember"})
+# Anchored at the end of an InvokeMember decl token: new Member(typeof(T), nameof(T.M) | "M")
+_MEMBER_ARGS_RE = re.compile(
+    rb'\s*new\s+Member\s*\(\s*typeof\s*\(\s*(\w+)\s*\)\s*,\s*'
+    rb'(?:nameof\s*\(\s*\w+\.(\w+)\s*\)|"(\w+)")'
+)
+_NEWLINE_RE = re.compile(rb'\n')
+
+# Files at least this large are scanned through mmap instead of being copied into memory
+_MMAP_MIN_SIZE = 1 << 20
+
 
 def check_file(path):
     """Run all VS-specific checks on a C# file. Returns list of issue dicts."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+            # Scan large files straight from the page cache; results hold no references
+            # into the mapping, so it can be closed as soon as the checks finish
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                return _check_source(source)
+        return _check_source(f.read())
+
+
+def _check_source(source):
+    """Run all checks on C# source given as bytes or a read-only mmap."""
     issues = []
-    source = Path(path).read_text(encoding="utf-8")
 
-    issues.extend(_check_comparison_accessors(source))
-    issues.extend(_check_void_result(source))
-    issues.extend(_check_multi_input_accessors(source))
+    # Cheap substring pre-filter: most files declare none of the checked unit types.
+    # find() rather than `in`, which tests a single byte on mmap objects.
+    has_cmp = source.find(b"Equal") != -1  # also covers NotEqual
+    has_invoke = source.find(b"InvokeMember") != -1
+    has_multi = any(source.find(unit) != -1 for unit in _MULTI_INPUT_TOKENS)
+    if not (has_cmp or has_invoke or has_multi):
+        return issues
+
+    # Map match offsets to line numbers without rescanning the file prefix per match.
+    # The newline table is built on the first issue, so clean files never pay for it.
+    newline_offsets = None
+
+    def line_of(pos):
+        nonlocal newline_offsets
+        if newline_offsets is None:
+            newline_offsets = [m.start() for m in _NEWLINE_RE.finditer(source)]
+        return bisect.bisect_right(newline_offsets, pos) + 1
+
+    comparison_vars = {}
+    invoke_vars = {}
+    multi_vars = {}
+    # Accessors are bucketed by port name as they are lexed, so each check only sees
+    # its own; they may precede their declaration, so resolve them after the walk
+    cmp_accesses = []
+    result_accesses = []
+    ab_accesses = []
+    for kind, m in _tokenize(source):
+        if kind == "access":
+            accessor = m.group("acc_name")
+            access = (m.group("acc_var"), accessor, m.start())
+            if accessor == b"result":
+                result_accesses.append(access)
+            elif accessor in (b"a", b"b"):
+                ab_accesses.append(access)
+            else:
+                cmp_accesses.append(access)
+            continue
+
+        decl_type, var_name, ctor = m.group("decl_type", "decl_var", "ctor")
+        if ctor in (b"Equal", b"NotEqual"):
+            if decl_type in _COMPARISON_DECL_TYPES:
+                comparison_vars[var_name] = _decode(ctor)
+        elif ctor == b"InvokeMember":
+            if decl_type not in _INVOKE_DECL_TYPES:
+                continue
+            args = _MEMBER_ARGS_RE.match(source, m.end())
+            if not args:
+                continue
+            type_name = _decode(args.group(1))
+            method_name = _decode(args.group(2) or args.group(3))
+            invoke_vars[var_name] = {
+                "type": type_name,
+                "method": method_name,
+                "is_void": method_name in _VOID_BY_TYPE.get(type_name, _NO_VOID_METHODS)
+            }
+        elif ctor in _MULTI_INPUT_CTORS:
+            multi_vars[var_name] = _decode(ctor)
+
+    if has_cmp:
+        issues.extend(_check_comparison_accessors(comparison_vars, cmp_accesses, line_of))
+    if has_invoke:
+        issues.extend(_check_void_result(invoke_vars, result_accesses, line_of))
+    if has_multi:
+        issues.extend(_check_multi_input_accessors(multi_vars, ab_accesses, line_of))
 
     return issues
 
 
-def _check_comparison_accessors(source):
+def _tokenize(source):
+    """Yield (kind, match) for each decl and access token in source, in order."""
+    for m in _TOKEN_RE.finditer(source):
+        yield m.lastgroup, m
+
+
+def _decode(raw):
+    """Decode a captured identifier for use in lookups and messages."""
+    return raw.decode("utf-8", "replace")
+
+
+def _check_comparison_accessors(comparison_vars, accesses, line_of):
     """VS-PORT-001: Detect equal.equal / notEqual.notEqual wrong accessor usage."""
     issues = []
+    if not comparison_vars:
+        return issues
 
-    # Find variables declared as Equal or NotEqual
-    type_pattern = re.compile(
-        r'(?:var|Equal|NotEqual)\s+(\w+)\s*=\s*new\s+(Equal|NotEqual)\s*\(',
-        re.MULTILINE
-    )
-    comparison_vars = {}
-    for m in type_pattern.finditer(source):
-        comparison_vars[m.group(1)] = m.group(2)
-
-    # Check for .equal or .notEqual accessor usage on those variables
-    accessor_pattern = re.compile(r'\b(\w+)\.(equal|notEqual)\b')
-    for m in accessor_pattern.finditer(source):
-        var_name = m.group(1)
-        accessor = m.group(2)
+    # Check for .equal or .notEqual accessor usage on Equal/NotEqual variables
+    for var_name, accessor, pos in accesses:
         if var_name in comparison_vars:
-            line_no = source[:m.start()].count('\n') + 1
+            line_no = line_of(pos)
+            var_name, accessor = _decode(var_name), _decode(accessor)
             issues.append({
                 "line": line_no,
                 "severity": "Error",
@@ -88,36 +205,18 @@ def _check_comparison_accessors(source):
     return issues
 
 
-def _check_void_result(source):
+def _check_void_result(invoke_vars, accesses, line_of):
     """VS-PORT-002: Detect .result usage on void method InvokeMember units."""
     issues = []
+    if not any(info["is_void"] for info in invoke_vars.values()):
+        return issues
 
-    # Find InvokeMember variables with their Member types
-    invoke_pattern = re.compile(
-        r'(?:var|InvokeMember)\s+(\w+)\s*=\s*new\s+InvokeMember\s*\(\s*'
-        r'new\s+Member\s*\(\s*typeof\s*\(\s*(\w+)\s*\)\s*,\s*'
-        r'(?:nameof\s*\(\s*\w+\.(\w+)\s*\)|"(\w+)")',
-        re.MULTILINE
-    )
-    invoke_vars = {}
-    for m in invoke_pattern.finditer(source):
-        var_name = m.group(1)
-        type_name = m.group(2)
-        method_name = m.group(3) or m.group(4)
-        void_methods = KNOWN_VOID_METHODS.get(type_name, set())
-        invoke_vars[var_name] = {
-            "type": type_name,
-            "method": method_name,
-            "is_void": method_name in void_methods
-        }
-
-    # Find .result usage on those variables
-    result_pattern = re.compile(r'\b(\w+)\.result\b')
-    for m in result_pattern.finditer(source):
-        var_name = m.group(1)
+    # Find .result usage on void InvokeMember variables
+    for var_name, _, pos in accesses:
         if var_name in invoke_vars and invoke_vars[var_name]["is_void"]:
             info = invoke_vars[var_name]
-            line_no = source[:m.start()].count('\n') + 1
+            line_no = line_of(pos)
+            var_name = _decode(var_name)
             issues.append({
                 "line": line_no,
                 "severity": "Error",
@@ -132,27 +231,19 @@ def _check_void_result(source):
     return issues
 
 
-def _check_multi_input_accessors(source):
+def _check_multi_input_accessors(multi_vars, accesses, line_of):
     """VS-PORT-003: Detect .a/.b usage on multi-input units (ScalarSum, GenericSum)."""
     issues = []
+    # .a/.b are common on Vector2, Color, etc.; nothing to check without a multi-input unit
+    if not multi_vars:
+        return issues
 
-    # Find multi-input unit variables
-    unit_pattern = re.compile(
-        r'(?:var|\w+)\s+(\w+)\s*=\s*new\s+(' + '|'.join(MULTI_INPUT_UNITS) + r')\s*\(',
-        re.MULTILINE
-    )
-    multi_vars = {}
-    for m in unit_pattern.finditer(source):
-        multi_vars[m.group(1)] = m.group(2)
-
-    # Check for .a or .b accessor usage
-    ab_pattern = re.compile(r'\b(\w+)\.(a|b)\b')
-    for m in ab_pattern.finditer(source):
-        var_name = m.group(1)
-        accessor = m.group(2)
+    # Check for .a or .b accessor usage on multi-input unit variables
+    for var_name, accessor, pos in accesses:
         if var_name in multi_vars:
             unit_type = multi_vars[var_name]
-            line_no = source[:m.start()].count('\n') + 1
+            line_no = line_of(pos)
+            var_name, accessor = _decode(var_name), _decode(accessor)
             idx = 0 if accessor == "a" else 1
             issues.append({
                 "line": line_no,
@@ -169,31 +260,46 @@ def _check_multi_input_accessors(source):
     return issues
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: check_port_keys.py <cs_file>", file=sys.stderr)
-        sys.exit(2)
-
-    cs_file = sys.argv[1]
-    if not Path(cs_file).exists():
-        print(f"ERROR: File not found: {cs_file}", file=sys.stderr)
-        sys.exit(2)
-
-    issues = check_file(cs_file)
+def format_report(issues):
+    """Format issues as the CLI report. Returns (exit_code, report_text)."""
     errors = [i for i in issues if i["severity"] == "Error"]
     warnings = [i for i in issues if i["severity"] == "Warning"]
 
     if not issues:
-        print("Port key check PASSED: No issues found.")
-        sys.exit(0)
+        return 0, "Port key check PASSED: No issues found."
 
+    lines = []
     for i in errors:
-        print(f"  ERROR {i['code']} (line {i['line']}): {i['message']}")
+        lines.append(f"  ERROR {i['code']} (line {i['line']}): {i['message']}")
     for i in warnings:
-        print(f"  WARNING {i['code']} (line {i['line']}): {i['message']}")
+        lines.append(f"  WARNING {i['code']} (line {i['line']}): {i['message']}")
+
+    lines.append(f"\nTotal: {len(errors)} error(s), {len(warnings)} warning(s)")
+    return (1 if errors else 0), "\n".join(lines)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: check_port_keys.py <cs_file> [<cs_file> ...]", file=sys.stderr)
+        sys.exit(2)
 
-    print(f"\nTotal: {len(errors)} error(s), {len(warnings)} warning(s)")
-    sys.exit(1 if errors else 0)
+    cs_files = sys.argv[1:]
+    exit_code = 0
+    for n, cs_file in enumerate(cs_files):
+        if len(cs_files) > 1:
+            if n:
+                print()
+            print(f"=== {cs_file} ===")
+        if not Path(cs_file).exists():
+            print(f"ERROR: File not found: {cs_file}", file=sys.stderr)
+            exit_code = 2
+            continue
+
+        rc, report = format_report(check_file(cs_file))
+        print(report)
+        exit_code = max(exit_code, rc)
+
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
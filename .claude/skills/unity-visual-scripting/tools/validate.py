@@ -3,6 +3,7 @@
 validate.py - Combined C# validator for Unity Visual Scripting skill.
 
 Runs both Roslyn semantic validation and VS-specific port-key checks.
+Results are cached by file contents, so re-validating an unchanged file is instant.
 
 Usage:
     python3 validate.py <generated.cs> [--unity-version VERSION] [--unity-project PATH]
@@ -13,70 +14,247 @@ Exit codes:
     2 - Usage or setup error
 """
 
+import concurrent.futures
+import contextlib
+import hashlib
+import io
+import json
+import os
+import stat
 import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
 
+try:
+    import check_port_keys
+except ImportError:
+    # Not importable from here; fall back to running it as a script
+    check_port_keys = None
+
+try:
+    import validate_cs
+except ImportError:
+    # Without it the reference assemblies can't be resolved, so results aren't cached
+    validate_cs = None
+
 TOOLS_DIR = Path(__file__).parent
+# Per-user cache directory; another user must not be able to plant passing results
+_UID = os.getuid() if hasattr(os, "getuid") else None
+_CACHE_DIR = Path(tempfile.gettempdir()) / (
+    "uvs_validate_cache" if _UID is None else f"uvs_validate_cache-{_UID}")
+_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds; older entries are pruned on each store
+
+# Files whose contents affect validation results; part of every cache key
+_TOOL_FILES = (
+    Path(__file__),
+    TOOLS_DIR / "validate_cs.py",
+    TOOLS_DIR / "check_port_keys.py",
+    TOOLS_DIR / "validation_project" / "ValidationProject.csproj",
+)
 
 
 def run_check(script, cs_file, extra_args=None):
     """Run a validation script and return (exit_code, stdout_output, stderr_output)."""
     cmd = [sys.executable, str(TOOLS_DIR / script), cs_file] + (extra_args or [])
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        return result.returncode, result.stdout.strip(), result.stderr.strip()
+        result = subprocess.run(cmd, capture_output=True, timeout=60)
+        # Strip the raw bytes and decode each stream once for the report
+        return (result.returncode,
+                result.stdout.strip().decode("utf-8", "replace"),
+                result.stderr.strip().decode("utf-8", "replace"))
     except subprocess.TimeoutExpired:
         return 2, "", f"Timeout running {script}"
     except FileNotFoundError:
         return 2, "", f"Script not found: {script}"
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: validate.py <cs_file> [--unity-version VERSION] [--unity-project PATH]")
-        sys.exit(2)
+def run_port_key_check(cs_file):
+    """Run the port-key check in-process when possible, same return shape as run_check."""
+    if check_port_keys is None:
+        return run_check("check_port_keys.py", cs_file)
+    try:
+        rc, report = check_port_keys.format_report(check_port_keys.check_file(cs_file))
+    except OSError as e:
+        return 2, "", f"Could not read {cs_file}: {e}"
+    return rc, report.strip(), ""
 
-    cs_file = sys.argv[1]
-    extra_args = sys.argv[2:]
 
-    if not Path(cs_file).exists():
-        print(f"ERROR: File not found: {cs_file}")
-        sys.exit(2)
+def _hash_part(h, data):
+    """Feed one length-prefixed field so adjacent fields can't run together."""
+    h.update(len(data).to_bytes(8, "little"))
+    h.update(data)
+
+
+def cache_key(cs_file, extra_args):
+    """Key results by everything the checks read, or None if that can't be resolved.
+
+    Covers the C# file contents, the validator arguments, the tool sources, the
+    resolved Unity Managed and ScriptAssemblies paths, and the name, size and mtime
+    of every DLL the validation project references from them.
+    """
+    if validate_cs is None:
+        return None
+    try:
+        # Parse errors and --help are reported by validate_cs.py itself; keep this silent
+        with contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            args = validate_cs.make_parser().parse_args([cs_file] + extra_args)
+    except SystemExit:
+        return None
+
+    try:
+        return _hash_inputs(cs_file, extra_args, args)
+    except OSError:
+        # An unreadable input only means "don't cache"; both layers still report it
+        return None
+
+
+def _hash_inputs(cs_file, extra_args, args):
+    """Hash the inputs listed in cache_key(); raises OSError if any can't be read."""
+    managed_dir = validate_cs.find_unity_managed_dir(args.unity_version, quiet=True)
+    script_assemblies = validate_cs.find_script_assemblies(args.unity_project)
+
+    h = hashlib.blake2b(digest_size=16)
+    _hash_part(h, Path(cs_file).read_bytes())
+    _hash_part(h, len(extra_args).to_bytes(8, "little"))
+    for arg in extra_args:
+        _hash_part(h, arg.encode("utf-8"))
+    for tool in _TOOL_FILES:
+        _hash_part(h, tool.read_bytes() if tool.exists() else b"")
+    for ref_dir in (managed_dir, script_assemblies):
+        _hash_part(h, str(ref_dir.resolve()).encode("utf-8") if ref_dir else b"")
+    for dll in validate_cs.reference_assemblies(managed_dir, script_assemblies):
+        st = dll.stat()
+        _hash_part(h, f"{dll.name}\0{st.st_size}\0{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _owned_by_user(st):
+    """True if a stat result belongs to the current user (always true without uids)."""
+    return _UID is None or st.st_uid == _UID
+
+
+def _cache_dir_ok():
+    """True if the cache directory is a real directory only the current user can write."""
+    try:
+        st = _CACHE_DIR.lstat()
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and _owned_by_user(st)
+            and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def load_cached(key):
+    """Return a cached (exit_code, output) pair, or None on a miss."""
+    if not _cache_dir_ok():
+        return None
+    path = _CACHE_DIR / f"{key}.json"
+    try:
+        # Ignore entries someone else managed to place here
+        if not _owned_by_user(path.lstat()):
+            return None
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        return entry["rc"], entry["out"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store_cached(key, rc, out):
+    """Store a validation result; cache write failures are not fatal."""
+    try:
+        _CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _cache_dir_ok():
+            return
+        (_CACHE_DIR / f"{key}.json").write_text(
+            json.dumps({"rc": rc, "out": out}), encoding="utf-8")
+        cutoff = time.time() - _CACHE_MAX_AGE
+        for entry in _CACHE_DIR.glob("*.json"):
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+    except OSError:
+        pass
 
+
+def run_all_checks(cs_file, extra_args):
+    """Run both validation layers. Returns (exit_code, output, cacheable)."""
+    lines = []
     has_errors = False
+    cacheable = True
+
+    # The two layers share no state, so run them side by side and report in order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        cs_future = pool.submit(run_check, "validate_cs.py", cs_file, extra_args)
+        port_future = pool.submit(run_port_key_check, cs_file)
+        rc1, out1, err1 = cs_future.result()
+        rc2, out2, err2 = port_future.result()
 
     # Layer 1: C# compilation check
-    print("=== C# Compilation Check ===")
-    rc1, out1, err1 = run_check("validate_cs.py", cs_file, extra_args)
+    lines.append("=== C# Compilation Check ===")
     if out1:
-        print(out1)
+        lines.append(out1)
+    if err1:
+        # Skipped or degraded runs (missing Unity, first-run restore) report on
+        # stderr; only cache results from a fully configured environment
+        cacheable = False
     if rc1 == 1:
         has_errors = True
     elif rc1 == 2:
-        print("  (C# validation skipped due to setup issue)")
+        lines.append("  (C# validation skipped due to setup issue)")
         if err1:
             print(f"  {err1}", file=sys.stderr)
 
-    print()
+    lines.append("")
 
     # Layer 2: VS port-key static analysis
-    print("=== VS Port Key Static Analysis ===")
-    rc2, out2, err2 = run_check("check_port_keys.py", cs_file)
+    lines.append("=== VS Port Key Static Analysis ===")
     if out2:
-        print(out2)
+        lines.append(out2)
     if rc2 == 1:
         has_errors = True
+    elif rc2 == 2:
+        # The file couldn't be checked at all; fail rather than report a clean pass
+        has_errors = True
+        cacheable = False
+        lines.append("  (Port key check could not run)")
+        if err2:
+            print(f"  {err2}", file=sys.stderr)
 
-    print()
+    lines.append("")
 
     # Summary
     if has_errors:
-        print("VALIDATION FAILED: Fix the errors above and re-validate.")
-        sys.exit(1)
+        lines.append("VALIDATION FAILED: Fix the errors above and re-validate.")
+    else:
+        lines.append("VALIDATION PASSED: All checks clean.")
+    return (1 if has_errors else 0), "\n".join(lines), cacheable
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: validate.py <cs_file> [--unity-version VERSION] [--unity-project PATH]")
+        sys.exit(2)
+
+    cs_file = sys.argv[1]
+    extra_args = sys.argv[2:]
+
+    if not Path(cs_file).exists():
+        print(f"ERROR: File not found: {cs_file}")
+        sys.exit(2)
+
+    # Re-validating an unchanged file replays the stored result
+    key = cache_key(cs_file, extra_args)
+    cached = load_cached(key) if key else None
+    if cached is not None:
+        rc, out = cached
     else:
-        print("VALIDATION PASSED: All checks clean.")
-        sys.exit(0)
+        rc, out, cacheable = run_all_checks(cs_file, extra_args)
+        if key and cacheable:
+            store_cached(key, rc, out)
+
+    print(out)
+    sys.exit(rc)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-validate_cs.py - Validate generated C# editor scripts using dotnet build.
+validate_cs.py - Validate generated C# editor scripts by compiling them with MSBuild.
 
 Usage:
     python3 validate_cs.py <path_to_cs_file> [--unity-version VERSION] [--unity-project PATH]
@@ -8,6 +8,7 @@ Usage:
 Outputs human-readable error list. Exits 0 (clean) or 1 (errors found).
 """
 
+import os
 import subprocess
 import re
 import sys
@@ -15,16 +16,19 @@ from pathlib import Path
 
 TOOL_DIR = Path(__file__).parent
 PROJECT_DIR = TOOL_DIR / "validation_project"
+PROJECT_FILE = PROJECT_DIR / "ValidationProject.csproj"
+ASSETS_FILE = PROJECT_DIR / "obj" / "project.assets.json"
+RESTORE_STAMP = PROJECT_DIR / "obj" / ".restore_stamp"
 DEFAULT_UNITY_VERSION = "6000.0.68f1"
 UNITY_EDITOR_BASE = Path("/Applications/Unity/Hub/Editor")
 
 # MSBuild diagnostic pattern: file(line,col): severity code: message [project]
 DIAG_PATTERN = re.compile(
-    r"^(.+?)\((\d+),(\d+)\):\s+(error|warning)\s+(CS\d+):\s+(.+?)\s+\[.+\]$"
+    rb"^(.+?)\((\d+),(\d+)\):\s+(error|warning)\s+(CS\d+):\s+(.+?)\s+\[.+\]$"
 )
 
 
-def find_unity_managed_dir(version):
+def find_unity_managed_dir(version, quiet=False):
     """Find Unity's Managed directory for the given editor version."""
     candidate = UNITY_EDITOR_BASE / version / "Unity.app" / "Contents" / "Managed"
     if candidate.exists():
@@ -34,21 +38,46 @@ def find_unity_managed_dir(version):
         for entry in sorted(UNITY_EDITOR_BASE.iterdir(), reverse=True):
             managed = entry / "Unity.app" / "Contents" / "Managed"
             if managed.exists():
-                print(f"NOTE: Unity {version} not found, using {entry.name}", file=sys.stderr)
+                if not quiet:
+                    print(f"NOTE: Unity {version} not found, using {entry.name}",
+                          file=sys.stderr)
                 return managed
     return None
 
 
+def find_script_assemblies(unity_project):
+    """Find a Unity project's compiled ScriptAssemblies directory (VS DLLs), if any."""
+    if not unity_project:
+        return None
+    script_assemblies = Path(unity_project).resolve() / "Library" / "ScriptAssemblies"
+    return script_assemblies if script_assemblies.exists() else None
+
+
+def reference_assemblies(managed_dir, script_assemblies=None):
+    """List the DLLs ValidationProject.csproj references for these directories."""
+    refs = []
+    if managed_dir:
+        # Mirrors the csproj: Unity 6+ module DLLs, else the facade DLLs
+        if (managed_dir / "UnityEngine").exists():
+            refs.extend(sorted((managed_dir / "UnityEngine").glob("*.dll")))
+        else:
+            refs.extend(p for p in (managed_dir / "UnityEngine.dll",
+                                    managed_dir / "UnityEditor.dll") if p.exists())
+    if script_assemblies:
+        refs.extend(sorted(script_assemblies.glob("Unity.VisualScripting*.dll")))
+    return refs
+
+
 def parse_diagnostics(output):
-    """Parse MSBuild output into diagnostic dicts."""
+    """Parse raw MSBuild output bytes into diagnostic dicts."""
     diagnostics = []
     for line in output.splitlines():
         m = DIAG_PATTERN.match(line.strip())
         if m:
             diagnostics.append({
-                "severity": "Error" if m.group(4) == "error" else "Warning",
-                "code": m.group(5),
-                "message": m.group(6),
+                "severity": "Error" if m.group(4) == b"error" else "Warning",
+                "code": m.group(5).decode("ascii"),
+                "message": m.group(6).decode("utf-8", "replace"),
                 "line": int(m.group(2)),
                 "column": int(m.group(3)),
             })
@@ -56,7 +85,7 @@ def parse_diagnostics(output):
 
 
 def validate(cs_path, unity_version, unity_project=None):
-    """Run dotnet build validation on a C# file."""
+    """Compile a C# file against the Unity references and return its diagnostics."""
     managed_dir = find_unity_managed_dir(unity_version)
     if not managed_dir:
         print("WARNING: Unity managed directory not found, skipping C# validation",
@@ -69,28 +98,48 @@ def validate(cs_path, unity_version, unity_project=None):
         "UnityManagedDir": str(managed_dir),
     }
 
-    if unity_project:
-        script_assemblies = Path(unity_project) / "Library" / "ScriptAssemblies"
-        if script_assemblies.exists():
-            props["VSAssembliesDir"] = str(script_assemblies)
+    script_assemblies = find_script_assemblies(unity_project)
+    if script_assemblies:
+        props["VSAssembliesDir"] = str(script_assemblies)
 
+    # Call MSBuild directly and run only the Compile target: diagnostics come from
+    # CoreCompile, so copying outputs and writing deps/reference assemblies is wasted work
     args = [
-        "dotnet", "build", str(PROJECT_DIR),
-        "--nologo", "--no-restore", "-v", "quiet",
-        "-clp:NoSummary",
+        "dotnet", "msbuild", str(PROJECT_FILE),
+        "-nologo", "-v:quiet", "-clp:NoSummary",
+        "-t:Compile", "-p:ProduceReferenceAssembly=false",
     ]
     for key, val in props.items():
         args.append(f"-p:{key}={val}")
 
-    result = subprocess.run(args, capture_output=True, text=True, timeout=30)
+    # Opt in to the MSBuild server, which stays alive between invocations so repeat
+    # validations skip MSBuild startup and project evaluation
+    env = dict(os.environ)
+    env.setdefault("DOTNET_CLI_USE_MSBUILD_SERVER", "1")
 
-    # Parse diagnostics from both stdout and stderr (MSBuild may write to either)
-    all_output = result.stdout + "\n" + result.stderr
+    result = subprocess.run(args, capture_output=True, timeout=30, env=env)
+
+    # Parse diagnostics from both stdout and stderr (MSBuild may write to either).
+    # Output stays as bytes; only the matched diagnostic messages are decoded.
+    all_output = result.stdout + b"\n" + result.stderr
     return parse_diagnostics(all_output)
 
 
+def _project_stamp():
+    """Stamp for the restore inputs: the project file's modification time."""
+    return str(PROJECT_FILE.stat().st_mtime_ns)
+
+
+def restore_is_current():
+    """True if a restore exists and was made from the current project file."""
+    try:
+        return ASSETS_FILE.exists() and RESTORE_STAMP.read_text() == _project_stamp()
+    except OSError:
+        return False
+
+
 def restore_project():
-    """Run dotnet restore once to ensure packages are available."""
+    """Run dotnet restore to ensure packages are available."""
     result = subprocess.run(
         ["dotnet", "restore", str(PROJECT_DIR), "--nologo", "-v", "quiet"],
         capture_output=True, text=True, timeout=30
@@ -98,10 +147,13 @@ def restore_project():
     if result.returncode != 0:
         print(f"Restore failed:\n{result.stderr}", file=sys.stderr)
         return False
+    # Record what was restored so later runs can skip restore without guessing
+    RESTORE_STAMP.write_text(_project_stamp())
     return True
 
 
-def main():
+def make_parser():
+    """Build the command-line parser (shared with validate.py's cache key)."""
     import argparse
     parser = argparse.ArgumentParser(description="C# validator for Unity scripts")
     parser.add_argument("cs_file", help="Path to C# file to validate")
@@ -109,15 +161,20 @@ def main():
                         help=f"Unity editor version (default: {DEFAULT_UNITY_VERSION})")
     parser.add_argument("--unity-project", default=None,
                         help="Path to Unity project (for VS DLLs)")
+    return parser
+
+
+def main():
+    parser = make_parser()
     args = parser.parse_args()
 
     if not Path(args.cs_file).exists():
         print(f"ERROR: File not found: {args.cs_file}", file=sys.stderr)
         sys.exit(2)
 
-    # Ensure NuGet restore is done (first run only, near-instant after that)
-    if not (PROJECT_DIR / "obj" / "project.assets.json").exists():
-        print("Restoring project (first run)...", file=sys.stderr)
+    # Ensure NuGet restore is done (first run, or after the project file changes)
+    if not restore_is_current():
+        print("Restoring project...", file=sys.stderr)
         if not restore_project():
             print("ERROR: Failed to restore project", file=sys.stderr)
             sys.exit(2)